@@ -1,13 +1,24 @@
-import json
+import logging
 import os
 import time
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import List, Dict
 import sys
-from colorama import init, Fore, Style
 
-# Initialize colorama for colored output
-init()
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+# Reuse one pooled connection across the polling loop instead of a fresh
+# TCP handshake per request
+session = requests.Session()
+session.mount("http://", HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=10,
+    max_retries=Retry(total=3, backoff_factor=0.3)
+))
 
 # Add the src directory to the Python path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
@@ -135,68 +146,69 @@ def generate_sample_queries() -> List[Dict]:
 
 def wait_for_qdrant(timeout: int = 60):
     """Wait for Qdrant to become available."""
-    print(f"{Fore.CYAN}Waiting for Qdrant to be ready...{Style.RESET_ALL}")
+    logger.info("Waiting for Qdrant to be ready...")
     start_time = time.time()
+    attempts = 0
 
     while time.time() - start_time < timeout:
         try:
-            response = requests.get("http://qdrant:6333/collections")
+            response = session.get("http://qdrant:6333/collections")
             if response.status_code == 200:
-                print(f"{Fore.GREEN}Qdrant is ready!{Style.RESET_ALL}")
+                logger.info("Qdrant is ready after %d attempts", attempts)
                 return True
         except requests.exceptions.RequestException:
             pass
-        print(".", end="", flush=True)
+        attempts += 1
         time.sleep(2)
 
-    print(f"\n{Fore.RED}Qdrant did not become ready within {timeout} seconds{Style.RESET_ALL}")
+    logger.error("Qdrant did not become ready within %d seconds (%d attempts)", timeout, attempts)
     return False
 
 def main():
     """Populate the vector database with payment documentation."""
     try:
-        print(f"{Fore.CYAN}Starting data population process...{Style.RESET_ALL}")
+        logger.info("Starting data population process...")
 
         # Wait for Qdrant to be ready
         if not wait_for_qdrant():
             sys.exit(1)
 
         # Generate documentation
-        print(f"{Fore.CYAN}Generating documentation...{Style.RESET_ALL}")
+        logger.info("Generating documentation...")
         docs = generate_payment_docs()
 
         # Save raw docs for reference
-        print(f"{Fore.CYAN}Saving documentation files...{Style.RESET_ALL}")
+        logger.info("Saving documentation files...")
         data_dir = os.path.join('/app', 'data')
         os.makedirs(data_dir, exist_ok=True)
 
-        with open(os.path.join(data_dir, 'payment_docs.json'), 'w') as f:
-            json.dump(docs, f, indent=2)
+        with open(os.path.join(data_dir, 'payment_docs.json'), 'wb') as f:
+            f.write(orjson.dumps(docs, option=orjson.OPT_INDENT_2))
 
         # Save sample queries
         queries = generate_sample_queries()
-        with open(os.path.join(data_dir, 'sample_queries.json'), 'w') as f:
-            json.dump(queries, f, indent=2)
+        with open(os.path.join(data_dir, 'sample_queries.json'), 'wb') as f:
+            f.write(orjson.dumps(queries, option=orjson.OPT_INDENT_2))
 
         # Initialize vector store and verify connection
-        print(f"{Fore.CYAN}Initializing vector store...{Style.RESET_ALL}")
+        logger.info("Initializing vector store...")
         config = Config()
         vector_store = VectorStore(config)
 
         # Add documents
-        print(f"{Fore.CYAN}Adding documents to vector store...{Style.RESET_ALL}")
+        logger.info("Adding documents to vector store...")
         vector_store.add_documents(docs)
 
-        print("Successfully populated vector database with payment documentation")
-        print(f"Added {len(docs)} documents")
-        print(f"Generated {len(queries)} sample queries")
-        print("\nTest the system with these sample queries using:")
-        print('curl -X POST http://localhost:8000/query \\')
-        print('  -H "Content-Type: application/json" \\')
-        print('  -d \'{"query": "Why was my card payment declined?"}\'')
+        logger.info("Successfully populated vector database with payment documentation")
+        logger.info("Added %d documents", len(docs))
+        logger.info("Generated %d sample queries", len(queries))
+        logger.info("\nTest the system with these sample queries using:")
+        logger.info('curl -X POST http://localhost:8000/query \\')
+        logger.info('  -H "Content-Type: application/json" \\')
+        logger.info('  -d \'{"query": "Why was my card payment declined?"}\'')
 
     except Exception as e:
-        print(f"Error populating database: {str(e)}")
+        logger.error("Error populating database: %s", str(e))
         raise
 
 if __name__ == "__main__":
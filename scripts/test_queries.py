@@ -1,13 +1,24 @@
 import json
+import logging
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import sys
 import os
 import time
 from typing import Dict, List
-from colorama import init, Fore, Style
 
-# Initialize colorama for colored output
-init()
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+logger = logging.getLogger(__name__)
+
+# Reuse one pooled connection for polling and test queries instead of a
+# fresh TCP handshake per request
+session = requests.Session()
+session.mount("http://", HTTPAdapter(
+    pool_connections=10,
+    pool_maxsize=10,
+    max_retries=Retry(total=3, backoff_factor=0.3)
+))
 
 def load_sample_queries() -> List[Dict]:
     """Load sample queries from the data file."""
@@ -15,84 +26,98 @@ def load_sample_queries() -> List[Dict]:
         with open('data/sample_queries.json', 'r') as f:
             return json.load(f)
     except FileNotFoundError:
-        print(f"{Fore.RED}Error: sample_queries.json not found. Run populate_data.py first.{Style.RESET_ALL}")
+        logger.error("Error: sample_queries.json not found. Run populate_data.py first.")
         sys.exit(1)
 
 def test_query(query: str, api_url: str = "http://app:8000/query") -> Dict:
-    """Send a test query to the API and return the response."""
+    """Send a test query to the API and assemble the streamed response."""
     try:
-        response = requests.post(
+        response = session.post(
             api_url,
             json={"query": query},
-            headers={"Content-Type": "application/json"}
+            headers={"Content-Type": "application/json"},
+            stream=True
         )
         response.raise_for_status()
-        return response.json()
+
+        session_id = None
+        tokens = []
+        for line in response.iter_lines():
+            if not line:
+                continue
+            payload = json.loads(line)
+            session_id = payload.get("session_id", session_id)
+            if "error" in payload:
+                logger.error("Error from API: %s", payload["error"])
+                return None
+            tokens.append(payload.get("token", ""))
+        return {"session_id": session_id, "response": "".join(tokens)}
     except requests.exceptions.RequestException as e:
-        print(f"{Fore.RED}Error making request: {str(e)}{Style.RESET_ALL}")
+        logger.error("Error making request: %s", str(e))
         return None
 
 def run_tests():
     """Run test queries and display results."""
-    print(f"{Fore.CYAN}Loading sample queries...{Style.RESET_ALL}")
+    logger.info("Loading sample queries...")
     queries = load_sample_queries()
 
-    print(f"{Fore.CYAN}Testing API responses...{Style.RESET_ALL}\n")
+    logger.info("Testing API responses...\n")
 
     for i, query_data in enumerate(queries, 1):
         query = query_data["query"]
         expected = query_data["expected_response"]
 
-        print(f"{Fore.YELLOW}Test {i}: {query}{Style.RESET_ALL}")
-        print(f"{Fore.BLUE}Expected to contain:{Style.RESET_ALL}")
-        print(expected.split('\n')[0])  # Print first line of expected response
+        logger.info("Test %d: %s", i, query)
+        logger.info("Expected to contain:")
+        logger.info(expected.split('\n')[0])  # Log first line of expected response
 
         response = test_query(query)
         if response:
-            print(f"{Fore.GREEN}Actual response:{Style.RESET_ALL}")
-            print(response["response"])
+            logger.info("Actual response:")
+            logger.info(response["response"])
 
             # Check if help center links are included
             if "help.deriv.com/payments" in response["response"].lower():
-                print(f"{Fore.GREEN}✓ Contains help center link{Style.RESET_ALL}")
+                logger.info("✓ Contains help center link")
             else:
-                print(f"{Fore.YELLOW}⚠ No help center link found{Style.RESET_ALL}")
-                print(f"{Fore.YELLOW}Expected URL format: https://help.deriv.com/payments/...\n{Style.RESET_ALL}")
+                logger.warning("⚠ No help center link found")
+                logger.warning("Expected URL format: https://help.deriv.com/payments/...\n")
 
-        print("\n" + "-"*80 + "\n")
+        logger.info("\n" + "-"*80 + "\n")
 
 def wait_for_api(timeout: int = 60):
     """Wait for the API to become available."""
-    print(f"{Fore.CYAN}Waiting for API to be ready...{Style.RESET_ALL}")
+    logger.info("Waiting for API to be ready...")
     start_time = time.time()
+    attempts = 0
 
     while time.time() - start_time < timeout:
         try:
-            response = requests.get("http://app:8000/health")
+            response = session.get("http://app:8000/health")
             if response.status_code == 200:
-                print(f"{Fore.GREEN}API is ready!{Style.RESET_ALL}")
+                logger.info("API is ready after %d attempts", attempts)
                 return True
         except requests.exceptions.RequestException:
             pass
-        print(".", end="", flush=True)
+        attempts += 1
         time.sleep(2)
 
-    print(f"\n{Fore.RED}API did not become ready within {timeout} seconds{Style.RESET_ALL}")
+    logger.error("API did not become ready within %d seconds (%d attempts)", timeout, attempts)
     return False
 
 def main():
     """Main test execution function."""
-    print(f"{Fore.CYAN}Payment Support System - Query Tests{Style.RESET_ALL}")
-    print("="*50 + "\n")
+    logger.info("Payment Support System - Query Tests")
+    logger.info("="*50 + "\n")
 
     try:
         if not wait_for_api():
             sys.exit(1)
 
         run_tests()
-        print(f"{Fore.GREEN}Tests completed successfully!{Style.RESET_ALL}")
+        logger.info("Tests completed successfully!")
     except Exception as e:
-        print(f"{Fore.RED}Error during testing: {str(e)}{Style.RESET_ALL}")
+        logger.error("Error during testing: %s", str(e))
         sys.exit(1)
 
 if __name__ == "__main__":
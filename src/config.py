@@ -15,3 +15,6 @@ class Config:
     OLLAMA_BASE_URL: str = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
     CHUNK_SIZE: int = 500
     CHUNK_OVERLAP: int = 50
+    ENCODE_BATCH_SIZE: int = int(os.getenv("ENCODE_BATCH_SIZE", "64"))
+    UPLOAD_BATCH_SIZE: int = int(os.getenv("UPLOAD_BATCH_SIZE", "64"))
+    UPLOAD_PARALLEL: int = int(os.getenv("UPLOAD_PARALLEL", str(max(1, (os.cpu_count() or 2) // 2))))
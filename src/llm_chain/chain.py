@@ -1,8 +1,8 @@
 from langchain_community.llms import Ollama
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
-from langchain_core.runnables import RunnablePassthrough
-from typing import List, Dict
+from typing import List, Sequence, Optional
+import asyncio
 import logging
 from ..config import Config
 from ..mcp.protocol import Message
@@ -10,6 +10,10 @@ from ..mcp.protocol import Message
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Micro-batching window for coalescing concurrent LLM calls
+BATCH_WINDOW_SECONDS = 0.05
+BATCH_MAX_SIZE = 8
+
 class PaymentSupportChain:
     def __init__(self, config: Config):
         try:
@@ -35,9 +39,20 @@ Important: Make sure to include the relevant help.deriv.com/payments URL from th
 Assistant Response:"""
             )
 
-            self.chain = (
-                RunnablePassthrough() | self.prompt | self.llm | StrOutputParser()
-            )
+            # Partially evaluate the template once: split the invariant text
+            # around the three variables so each request only joins strings
+            # instead of re-scanning the whole template
+            template = self.prompt.template
+            self._prefix, rest = template.split("{context}", 1)
+            self._mid1, rest = rest.split("{conversation_history}", 1)
+            self._mid2, self._suffix = rest.split("{question}", 1)
+
+            self.chain = self.llm | StrOutputParser()
+
+            # Created by start_batcher once an event loop is running
+            self._batch_queue: Optional[asyncio.Queue] = None
+            self._batch_task: Optional[asyncio.Task] = None
+
             logger.info(f"Initialized PaymentSupportChain with model {config.LLM_MODEL}")
         except Exception as e:
             logger.error(f"Failed to initialize PaymentSupportChain: {str(e)}")
@@ -45,7 +60,7 @@ Assistant Response:"""
 
     def generate_response(
         self,
-        context: List[Dict],
+        context: Sequence[str],
         conversation_history: List[Message],
         question: str
     ) -> str:
@@ -54,11 +69,9 @@ Assistant Response:"""
             context_str = self._format_context(context)
             history_str = self._format_history(conversation_history)
 
-            response = self.chain.invoke({
-                "context": context_str,
-                "conversation_history": history_str,
-                "question": question
-            })
+            response = self.chain.invoke(
+                self._format_prompt(context_str, history_str, question)
+            )
 
             logger.info("Successfully generated response")
             return response
@@ -66,24 +79,147 @@ Assistant Response:"""
             logger.error(f"Error generating response: {str(e)}")
             raise RuntimeError(f"Failed to generate response: {str(e)}")
 
-    def _format_context(self, context: List[Dict]) -> str:
-        """Helper method to format context documents into a string."""
+    async def agenerate_response(
+        self,
+        context: Sequence[str],
+        conversation_history: List[Message],
+        question: str
+    ) -> str:
+        """Async variant of generate_response for use inside request handlers."""
         try:
-            return "\n\n".join([
-                f"Document {i+1}:\n{doc['content']}"
-                for i, doc in enumerate(context)
-            ])
+            logger.info(f"Generating response for question: {question}")
+            context_str = self._format_context(context)
+            history_str = self._format_history(conversation_history)
+
+            prompt = self._format_prompt(context_str, history_str, question)
+            if self._batch_queue is not None:
+                future = asyncio.get_running_loop().create_future()
+                await self._batch_queue.put((prompt, future))
+                response = await future
+            else:
+                response = await self.chain.ainvoke(prompt)
+
+            logger.info("Successfully generated response")
+            return response
         except Exception as e:
-            logger.error(f"Error formatting context: {str(e)}")
-            raise ValueError(f"Invalid context format: {str(e)}")
+            logger.error(f"Error generating response: {str(e)}")
+            raise RuntimeError(f"Failed to generate response: {str(e)}")
+
+    async def astream_response(
+        self,
+        context: Sequence[str],
+        conversation_history: List[Message],
+        question: str
+    ):
+        """Yield response tokens as the LLM generates them."""
+        logger.info(f"Streaming response for question: {question}")
+        context_str = self._format_context(context)
+        history_str = self._format_history(conversation_history)
+        prompt = self._format_prompt(context_str, history_str, question)
+        async for token in self.chain.astream(prompt):
+            yield token
+
+    async def start_batcher(self) -> None:
+        """Start the background task that coalesces concurrent LLM calls.
+
+        Only agenerate_response consumes the batch queue; astream_response
+        streams directly. The API lifespan does not start the batcher, so
+        callers serving the buffered path must do so themselves.
+        """
+        if self._batch_task is None:
+            self._batch_queue = asyncio.Queue()
+            self._batch_task = asyncio.create_task(self._batch_worker())
+            logger.info("Started LLM micro-batcher")
+
+    async def stop_batcher(self) -> None:
+        """Stop the micro-batcher and fall back to direct LLM calls.
+
+        Prompts still queued at shutdown are failed rather than stranded, so
+        callers blocked in agenerate_response see an error instead of
+        awaiting a future that will never resolve.
+        """
+        if self._batch_task is not None:
+            self._batch_task.cancel()
+            try:
+                await self._batch_task
+            except asyncio.CancelledError:
+                pass
+            queue, self._batch_queue = self._batch_queue, None
+            self._batch_task = None
+            pending = []
+            while not queue.empty():
+                pending.append(queue.get_nowait())
+            self._fail_pending(pending)
+            logger.info("Stopped LLM micro-batcher")
+
+    @staticmethod
+    def _fail_pending(pending) -> None:
+        """Fail futures whose prompts will never be dispatched."""
+        for _, future in pending:
+            if not future.done():
+                future.set_exception(
+                    RuntimeError("LLM micro-batcher stopped before dispatch")
+                )
+
+    async def _batch_worker(self) -> None:
+        """Drain pending prompts in ≤50ms windows and dispatch them together.
+
+        Concurrent requests are issued to Ollama in one asyncio.gather so the
+        server can batch them, instead of one serialized call per request.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = []
+            try:
+                batch.append(await self._batch_queue.get())
+                deadline = loop.time() + BATCH_WINDOW_SECONDS
+                while len(batch) < BATCH_MAX_SIZE:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(
+                            await asyncio.wait_for(self._batch_queue.get(), timeout)
+                        )
+                    except asyncio.TimeoutError:
+                        break
+
+                results = await asyncio.gather(
+                    *(self.chain.ainvoke(prompt) for prompt, _ in batch),
+                    return_exceptions=True
+                )
+            except asyncio.CancelledError:
+                # Entries already pulled off the queue would otherwise be
+                # missed by stop_batcher's drain
+                self._fail_pending(batch)
+                raise
+            for (_, future), result in zip(batch, results):
+                if future.cancelled():
+                    continue
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+
+    def _format_prompt(self, context: str, history: str, question: str) -> str:
+        """Interpolate the pre-split template segments into a full prompt."""
+        return "".join((
+            self._prefix, context,
+            self._mid1, history,
+            self._mid2, question,
+            self._suffix
+        ))
+
+    def _format_context(self, context: Sequence[str]) -> str:
+        """Helper method to format context documents into a string."""
+        return "\n\n".join(
+            f"Document {i+1}:\n{content}"
+            for i, content in enumerate(context)
+        )
 
     def _format_history(self, history: List[Message]) -> str:
         """Helper method to format conversation history into a string."""
-        try:
-            return "\n".join([
-                f"{msg.role.capitalize()}: {msg.content}"
-                for msg in history
-            ])
-        except Exception as e:
-            logger.error(f"Error formatting history: {str(e)}")
-            raise ValueError(f"Invalid history format: {str(e)}")
+        return "\n".join(
+            f"{msg.role.capitalize()}: {msg.content}"
+            for msg in history
+        )
@@ -1,7 +1,10 @@
 import logging
-import uuid
+import os
+import secrets
 from typing import Optional, Dict
-from fastapi import FastAPI, HTTPException, Depends
+from fastapi import FastAPI, Depends
+from fastapi.responses import ORJSONResponse, StreamingResponse
+import orjson
 from pydantic import BaseModel
 from contextlib import asynccontextmanager
 
@@ -19,10 +22,6 @@ class QueryRequest(BaseModel):
     session_id: Optional[str] = None
     context_size: Optional[int] = 5
 
-class QueryResponse(BaseModel):
-    session_id: str
-    response: str
-
 class PaymentSupportSystem:
     def __init__(self):
         try:
@@ -41,18 +40,25 @@ class PaymentSupportSystem:
         query: str,
         context_size: int = 5
     ) -> str:
+        """Buffered query path: returns the full response in one string.
+
+        Not used by the streaming /query route; kept for programmatic
+        callers. This is the only path that goes through the LLM
+        micro-batcher — call llm_chain.start_batcher() first to coalesce
+        concurrent calls, otherwise each request is dispatched directly.
+        """
         try:
             logger.info(f"Processing query for session {session_id}: {query}")
 
-            # Get relevant documents
-            relevant_docs = self.vector_store.search(query, limit=context_size)
+            # Get relevant documents without blocking the event loop
+            relevant_docs = await self.vector_store.asearch(query, limit=context_size)
             logger.info(f"Found {len(relevant_docs)} relevant documents")
 
             # Get conversation history
             conversation_history = self.mcp.get_context(session_id)
 
             # Generate response
-            response = self.llm_chain.generate_response(
+            response = await self.llm_chain.agenerate_response(
                 context=relevant_docs,
                 conversation_history=conversation_history,
                 question=query
@@ -68,9 +74,40 @@ class PaymentSupportSystem:
             logger.error(f"Error processing query: {str(e)}")
             raise RuntimeError(f"Failed to process query: {str(e)}")
 
+    async def stream_query(
+        self,
+        session_id: str,
+        query: str,
+        context_size: int = 5
+    ):
+        """Yield response tokens for a query, updating history once complete."""
+        logger.info(f"Streaming query for session {session_id}: {query}")
+
+        relevant_docs = await self.vector_store.asearch(query, limit=context_size)
+        logger.info(f"Found {len(relevant_docs)} relevant documents")
+
+        conversation_history = self.mcp.get_context(session_id)
+
+        chunks = []
+        async for token in self.llm_chain.astream_response(
+            context=relevant_docs,
+            conversation_history=conversation_history,
+            question=query
+        ):
+            chunks.append(token)
+            yield token
+
+        # Record the exchange only after the full response has streamed
+        self.mcp.add_message(session_id, "user", query)
+        self.mcp.add_message(session_id, "assistant", "".join(chunks))
+        logger.info(f"Successfully streamed query for session {session_id}")
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup
+    # Startup. The LLM micro-batcher is not started here: the /query route
+    # streams through astream_response, which bypasses the batch queue, so a
+    # worker task would only burn cycles. Deployments serving the buffered
+    # process_query path should start it themselves.
     try:
         app.state.support_system = PaymentSupportSystem()
         logger.info("Application startup complete")
@@ -79,30 +116,34 @@ async def lifespan(app: FastAPI):
         logger.error(f"Application startup failed: {str(e)}")
         raise
     finally:
-        # Cleanup
         logger.info("Application shutdown")
 
-app = FastAPI(lifespan=lifespan)
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 
 async def get_support_system() -> PaymentSupportSystem:
     return app.state.support_system
 
-@app.post("/query", response_model=QueryResponse)
+@app.post("/query")
 async def query_endpoint(
     request: QueryRequest,
     support_system: PaymentSupportSystem = Depends(get_support_system)
 ):
-    try:
-        session_id = request.session_id or str(uuid.uuid4())
-        response = await support_system.process_query(
-            session_id=session_id,
-            query=request.query,
-            context_size=request.context_size
-        )
-        return QueryResponse(session_id=session_id, response=response)
-    except Exception as e:
-        logger.error(f"Error in query endpoint: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
+    session_id = request.session_id or secrets.token_urlsafe(16)
+
+    async def event_stream():
+        try:
+            async for token in support_system.stream_query(
+                session_id=session_id,
+                query=request.query,
+                context_size=request.context_size
+            ):
+                yield orjson.dumps({"session_id": session_id, "token": token}) + b"\n"
+        except Exception as e:
+            # Headers are already sent, so surface errors in-band
+            logger.error(f"Error in query endpoint: {str(e)}")
+            yield orjson.dumps({"session_id": session_id, "error": str(e)}) + b"\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
 
 @app.get("/health")
 async def health_check():
@@ -110,4 +151,15 @@ async def health_check():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # One worker per core with the uvloop event loop and httptools parser.
+    # Note: conversation state lives in each worker's ModelContextProtocol,
+    # so multi-worker deployments need session affinity (or a shared store)
+    # for follow-up questions to see their history.
+    uvicorn.run(
+        "src.main:app",
+        host="0.0.0.0",
+        port=8000,
+        workers=os.cpu_count(),
+        loop="uvloop",
+        http="httptools"
+    )
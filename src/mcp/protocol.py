@@ -1,7 +1,13 @@
+from cachetools import TTLCache
+from collections import deque
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional
+from itertools import islice
+from typing import Deque, List, Dict, Optional
 from datetime import datetime
 
+# Upper bound on retained messages per session; older entries are dropped
+MAX_HISTORY = 200
+
 @dataclass
 class Message:
     role: str
@@ -10,12 +16,14 @@ class Message:
 
 @dataclass
 class Conversation:
-    messages: List[Message] = field(default_factory=list)
+    messages: Deque[Message] = field(default_factory=lambda: deque(maxlen=MAX_HISTORY))
     metadata: Dict = field(default_factory=dict)
 
 class ModelContextProtocol:
     def __init__(self):
-        self.conversations: Dict[str, Conversation] = {}
+        # TTLCache evicts stale sessions automatically, bounding resident
+        # memory on long-running servers; it behaves like a regular mapping
+        self.conversations: TTLCache = TTLCache(maxsize=10_000, ttl=3600)
 
     def create_session(self, session_id: str) -> None:
         if session_id not in self.conversations:
@@ -30,7 +38,9 @@ class ModelContextProtocol:
     def get_context(self, session_id: str, max_messages: int = 10) -> List[Message]:
         if session_id not in self.conversations:
             return []
-        return self.conversations[session_id].messages[-max_messages:]
+        messages = self.conversations[session_id].messages
+        start = max(0, len(messages) - max_messages)
+        return list(islice(messages, start, len(messages)))
 
     def clear_session(self, session_id: str) -> None:
         if session_id in self.conversations:
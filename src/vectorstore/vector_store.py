@@ -1,15 +1,47 @@
-from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, Record
+from qdrant_client import QdrantClient, AsyncQdrantClient
+from qdrant_client.models import (
+    Distance,
+    VectorParams,
+    OptimizersConfigDiff,
+    ScalarQuantization,
+    ScalarQuantizationConfig,
+    ScalarType,
+)
 from sentence_transformers import SentenceTransformer
-from typing import List, Dict, Any
+from cachetools import TTLCache
+from typing import List, Dict, Any, Tuple
+import functools
 import numpy as np
+import torch
 from ..config import Config
 
 class VectorStore:
     def __init__(self, config: Config):
         self.config = config
         self.client = QdrantClient(host=config.QDRANT_HOST, port=config.QDRANT_PORT)
-        self.embedding_model = SentenceTransformer(config.EMBEDDING_MODEL)
+        # Async client for request handlers so searches don't block the event loop
+        self.aclient = AsyncQdrantClient(host=config.QDRANT_HOST, port=config.QDRANT_PORT)
+        # Run the encoder on the GPU when one is available; a single query
+        # encode drops from 100-200ms on CPU to <10ms
+        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.embedding_model = SentenceTransformer(config.EMBEDDING_MODEL, device=self.device)
+
+        # Half precision halves activation bandwidth on GPU; torch.compile
+        # fuses pointwise ops and removes Python dispatch inside the encoder.
+        # CPU inference stays in float32: sentence-transformers materializes
+        # embeddings via Tensor.numpy(), which has no bfloat16 support
+        if self.device == "cuda":
+            self.embedding_model = self.embedding_model.half()
+        self.embedding_model.forward = torch.compile(
+            self.embedding_model.forward, mode="reduce-overhead", fullgraph=False
+        )
+
+        # Per-instance LRU so repeated queries skip the transformer forward pass
+        self._encode_query = functools.lru_cache(maxsize=1024)(self._encode_query_uncached)
+
+        # Top-k results are stable between ingests, so repeat queries can skip
+        # the Qdrant round trip entirely; invalidated by add_documents
+        self._search_cache: TTLCache = TTLCache(maxsize=2048, ttl=300)
 
         # Initialize collection if it doesn't exist
         self._init_collection()
@@ -19,30 +51,91 @@ class VectorStore:
         if not any(c.name == self.config.COLLECTION_NAME for c in collections):
             self.client.create_collection(
                 collection_name=self.config.COLLECTION_NAME,
-                vectors_config=VectorParams(size=768, distance=Distance.COSINE)
+                # Vectors are normalized at encode time, so plain dot product
+                # matches cosine ranking without per-candidate norm computations
+                vectors_config=VectorParams(size=768, distance=Distance.DOT),
+                # Defer HNSW index construction until bulk ingest is done
+                optimizers_config=OptimizersConfigDiff(indexing_threshold=0),
+                # int8 codes cut vector memory 4x and let Qdrant score
+                # candidates with SIMD int8 dot products
+                quantization_config=ScalarQuantization(
+                    scalar=ScalarQuantizationConfig(
+                        type=ScalarType.INT8,
+                        quantile=0.99,
+                        always_ram=True
+                    )
+                )
             )
 
     def add_documents(self, documents: List[Dict[str, Any]]):
-        embeddings = self.embedding_model.encode([doc["content"] for doc in documents])
+        texts = [doc["content"] for doc in documents]
 
-        records = [
-            Record(
-                id=idx,
-                vector=embedding.tolist(),
-                payload=doc
-            ) for idx, (doc, embedding) in enumerate(zip(documents, embeddings))
-        ]
+        # Encode in length-sorted order so batches waste less work on padding,
+        # then restore the original document order before uploading
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        sorted_embeddings = self.embedding_model.encode(
+            [texts[i] for i in order],
+            # Larger batches are needed to saturate a GPU
+            batch_size=256 if self.device == "cuda" else self.config.ENCODE_BATCH_SIZE,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=False
+        )
+        embeddings = np.empty_like(sorted_embeddings)
+        embeddings[order] = sorted_embeddings
 
-        self.client.upload_records(
+        # upload_collection shards the upload across worker processes and
+        # pipelines batches to Qdrant instead of a single synchronous request
+        self.client.upload_collection(
             collection_name=self.config.COLLECTION_NAME,
-            records=records
+            vectors=embeddings,
+            payload=documents,
+            ids=list(range(len(documents))),
+            batch_size=self.config.UPLOAD_BATCH_SIZE,
+            parallel=self.config.UPLOAD_PARALLEL
         )
 
-    def search(self, query: str, limit: int = 5) -> List[Dict[str, Any]]:
-        query_embedding = self.embedding_model.encode(query)
+        # Re-enable indexing now that the bulk upload is complete
+        self.client.update_collection(
+            collection_name=self.config.COLLECTION_NAME,
+            optimizer_config=OptimizersConfigDiff(indexing_threshold=20000)
+        )
+
+        # Cached result sets are stale once new documents land
+        self._search_cache.clear()
+
+    def _encode_query_uncached(self, query: str) -> np.ndarray:
+        return self.embedding_model.encode(query, normalize_embeddings=True)
+
+    def search(self, query: str, limit: int = 5) -> Tuple[str, ...]:
+        key = (query, limit)
+        hit = self._search_cache.get(key)
+        if hit is not None:
+            return hit
+
+        query_embedding = self._encode_query(query)
         results = self.client.search(
             collection_name=self.config.COLLECTION_NAME,
             query_vector=query_embedding.tolist(),
             limit=limit
         )
-        return [hit.payload for hit in results]
+        # Downstream only reads the content field, so carry just that
+        contents = tuple(hit.payload["content"] for hit in results)
+        self._search_cache[key] = contents
+        return contents
+
+    async def asearch(self, query: str, limit: int = 5) -> Tuple[str, ...]:
+        key = (query, limit)
+        hit = self._search_cache.get(key)
+        if hit is not None:
+            return hit
+
+        query_embedding = self._encode_query(query)
+        results = await self.aclient.search(
+            collection_name=self.config.COLLECTION_NAME,
+            query_vector=query_embedding.tolist(),
+            limit=limit
+        )
+        contents = tuple(hit.payload["content"] for hit in results)
+        self._search_cache[key] = contents
+        return contents
@@ -3,9 +3,15 @@ import pytest
 from unittest.mock import Mock
 from src.config import Config
 
-@pytest.fixture
+def pytest_configure(config):
+    """Disable the cacheprovider plugin: nothing here uses --lf/--ff, so the
+    .pytest_cache writes on every run are pure overhead."""
+    config.pluginmanager.set_blocked("cacheprovider")
+
+@pytest.fixture(scope="session")
 def mock_config():
-    """Create a mock configuration for testing."""
+    """Create a mock configuration for testing. Session-scoped: no test
+    mutates it, and wider scope lets module-scoped SUT fixtures reuse it."""
     config = Mock(spec=Config)
     config.QDRANT_HOST = "qdrant"
     config.QDRANT_PORT = 6333
@@ -13,6 +19,9 @@ def mock_config():
     config.EMBEDDING_MODEL = "all-MiniLM-L6-v2"
     config.OLLAMA_BASE_URL = "http://ollama:11434"
     config.LLM_MODEL = "llama2"
+    config.ENCODE_BATCH_SIZE = 64
+    config.UPLOAD_BATCH_SIZE = 64
+    config.UPLOAD_PARALLEL = 2
     return config
 
 @pytest.fixture
@@ -31,8 +40,16 @@ def mock_collections_response():
 
 @pytest.fixture
 def mock_qdrant_client(mock_collections_response):
-    """Create a mock Qdrant client with basic setup."""
-    client = Mock()
+    """Create a mock Qdrant client with basic setup.
+
+    Spec'd against QdrantClient so attribute access doesn't auto-create a
+    child Mock for every method the tests never touch. Imported here rather
+    than at module level so `pytest -k` subsets that never request the
+    fixture skip the qdrant_client import entirely.
+    """
+    from qdrant_client import QdrantClient
+
+    client = Mock(spec=QdrantClient)
     client.get_collections.return_value = mock_collections_response
     return client
 
@@ -1,26 +1,35 @@
-"""Test configuration and collection utilities."""
+"""Test configuration and collection utilities.
+
+PYTEST_DONT_REWRITE - this module holds hooks, not assertions worth rewriting.
+"""
 import pytest
 from typing import List
 from _pytest.nodes import Item
 
+# Precompiled substring -> marker mapping, checked with an early break so each
+# item is scanned once instead of through an if/elif chain
+COMPONENT_MARKERS = (
+    ("test_vector_store", pytest.mark.vectorstore),
+    ("test_mcp", pytest.mark.mcp),
+    ("test_chain", pytest.mark.chain),
+    ("test_api", pytest.mark.api),
+)
+
 def pytest_collection_modifyitems(items: List[Item]) -> None:
     """Automatically add markers based on test module names and characteristics."""
     for item in items:
+        nodeid = item.nodeid
+
         # Add component markers
-        if "test_vector_store" in item.nodeid:
-            item.add_marker(pytest.mark.vectorstore)
-        elif "test_mcp" in item.nodeid:
-            item.add_marker(pytest.mark.mcp)
-        elif "test_chain" in item.nodeid:
-            item.add_marker(pytest.mark.chain)
-        elif "test_api" in item.nodeid:
-            item.add_marker(pytest.mark.api)
+        for substring, marker in COMPONENT_MARKERS:
+            if substring in nodeid:
+                item.add_marker(marker)
+                break
 
-        # Add test type markers
-        if item.get_closest_marker("integration") is None:
-            # Mark as unit test if not explicitly marked as integration
+        # Mark as unit test if not explicitly marked as integration
+        if "integration" not in {m.name for m in item.iter_markers()}:
             item.add_marker(pytest.mark.unit)
 
         # Add performance markers
-        if "test_performance" in item.nodeid or "benchmark" in item.nodeid:
+        if "test_performance" in nodeid or "benchmark" in nodeid:
             item.add_marker(pytest.mark.slow)
@@ -1,14 +1,50 @@
 import pytest
 import numpy as np
-from unittest.mock import Mock, patch
-from src.vectorstore.vector_store import VectorStore
-from qdrant_client.models import Record
+from unittest.mock import ANY, Mock
 
-@patch('src.vectorstore.vector_store.QdrantClient')
-@patch('src.vectorstore.vector_store.SentenceTransformer')
-def test_vector_store_initialization_new_collection(mock_transformer, mock_qdrant, mock_config, mock_qdrant_client):
+# Group vector store tests on one xdist worker under --dist=loadgroup
+pytestmark = pytest.mark.xdist_group("vectorstore")
+
+# Frozen embedding constants shared across tests; float32 matches what the
+# encoder emits and avoids rebuilding arrays in every fixture invocation
+_EMB_2D = np.array([[0.1, 0.2], [0.3, 0.4]], dtype=np.float32)
+_EMB_1D = np.array([0.1, 0.2], dtype=np.float32)
+
+@pytest.fixture
+def mock_embeddings():
+    """Mock embeddings as numpy arrays."""
+    return _EMB_2D
+
+@pytest.fixture(scope="session")
+def VectorStore():
+    """Import the SUT lazily so `pytest -k` subsets that skip this file never
+    pay the torch/qdrant/sentence-transformers import cost at collection time."""
+    from src.vectorstore.vector_store import VectorStore as _VectorStore
+    return _VectorStore
+
+def _patch_dependencies(mocker, client):
+    """Patch VectorStore's external dependencies and return the mocks.
+
+    .half() returns the same model mock so encode expectations survive the
+    CUDA precision cast, and torch.compile is patched to identity so nothing
+    tries to compile a Mock's forward.
+    """
+    mock_transformer = mocker.patch('src.vectorstore.vector_store.SentenceTransformer')
+    model = mock_transformer.return_value
+    model.half.return_value = model
+    mocker.patch(
+        'src.vectorstore.vector_store.torch.compile',
+        side_effect=lambda fn, **kwargs: fn
+    )
+    mocker.patch('src.vectorstore.vector_store.AsyncQdrantClient')
+    mock_qdrant = mocker.patch(
+        'src.vectorstore.vector_store.QdrantClient', return_value=client
+    )
+    return mock_transformer, mock_qdrant
+
+def test_vector_store_initialization_new_collection(mocker, mock_config, mock_qdrant_client, VectorStore):
     # Arrange
-    mock_qdrant.return_value = mock_qdrant_client
+    mock_transformer, mock_qdrant = _patch_dependencies(mocker, mock_qdrant_client)
 
     # Act
     vector_store = VectorStore(mock_config)
@@ -18,19 +54,17 @@ def test_vector_store_initialization_new_collection(mock_transformer, mock_qdran
         host=mock_config.QDRANT_HOST,
         port=mock_config.QDRANT_PORT
     )
-    mock_transformer.assert_called_once_with(mock_config.EMBEDDING_MODEL)
-    mock_qdrant_client.create_collection.assert_called_once()
+    mock_transformer.assert_called_once_with(mock_config.EMBEDDING_MODEL, device=ANY)
+    assert mock_qdrant_client.create_collection.call_count == 1
 
-@patch('src.vectorstore.vector_store.QdrantClient')
-@patch('src.vectorstore.vector_store.SentenceTransformer')
 def test_vector_store_initialization_existing_collection(
-    mock_transformer, mock_qdrant, mock_config, mock_collection, mock_collections_response
+    mocker, mock_config, mock_collection, mock_collections_response, VectorStore
 ):
     # Arrange
     mock_collections_response.collections = [mock_collection]
     mock_client = Mock()
     mock_client.get_collections.return_value = mock_collections_response
-    mock_qdrant.return_value = mock_client
+    _patch_dependencies(mocker, mock_client)
 
     # Act
     vector_store = VectorStore(mock_config)
@@ -38,18 +72,11 @@ def test_vector_store_initialization_existing_collection(
     # Assert
     mock_client.create_collection.assert_not_called()
 
-@pytest.fixture
-def mock_embeddings():
-    """Mock embeddings as numpy arrays."""
-    return np.array([[0.1, 0.2], [0.3, 0.4]])
-
-@patch('src.vectorstore.vector_store.QdrantClient')
-@patch('src.vectorstore.vector_store.SentenceTransformer')
 def test_add_documents(
-    mock_transformer, mock_qdrant, mock_config, mock_qdrant_client, sample_documents, mock_embeddings
+    mocker, mock_config, mock_qdrant_client, sample_documents, mock_embeddings, VectorStore
 ):
     # Arrange
-    mock_qdrant.return_value = mock_qdrant_client
+    mock_transformer, _ = _patch_dependencies(mocker, mock_qdrant_client)
     mock_transformer.return_value.encode.return_value = mock_embeddings
     vector_store = VectorStore(mock_config)
 
@@ -57,65 +84,99 @@ def test_add_documents(
     vector_store.add_documents(sample_documents)
 
     # Assert
-    mock_transformer.return_value.encode.assert_called_once()
-    mock_qdrant_client.upload_records.assert_called_once()
-
-    # Verify records format
-    call_args = mock_qdrant_client.upload_records.call_args[1]
-    records = call_args['records']
-    assert isinstance(records[0], Record)
-    assert isinstance(records[0].vector, list)
-
-@patch('src.vectorstore.vector_store.QdrantClient')
-@patch('src.vectorstore.vector_store.SentenceTransformer')
-def test_search(mock_transformer, mock_qdrant, mock_config, mock_qdrant_client):
+    assert mock_transformer.return_value.encode.call_count == 1
+    assert mock_qdrant_client.upload_collection.call_count == 1
+
+    # Verify upload format (snapshot kwargs once instead of re-walking _Call)
+    kwargs = mock_qdrant_client.upload_collection.call_args.kwargs
+    assert kwargs['payload'] == sample_documents
+    assert kwargs['ids'] == list(range(len(sample_documents)))
+    assert kwargs['batch_size'] == mock_config.UPLOAD_BATCH_SIZE
+    assert kwargs['parallel'] == mock_config.UPLOAD_PARALLEL
+
+    # Indexing is re-enabled after the bulk upload
+    assert mock_qdrant_client.update_collection.call_count == 1
+
+@pytest.mark.parametrize("search_return,expected_len", [
+    ([Mock(payload={"content": "Test response"})], 1),
+    ([], 0),  # Empty search results
+])
+def test_search(
+    mocker, mock_config, mock_qdrant_client, VectorStore, search_return, expected_len
+):
     # Arrange
-    mock_qdrant.return_value = mock_qdrant_client
+    mock_transformer, _ = _patch_dependencies(mocker, mock_qdrant_client)
     # Mock embedding as numpy array since VectorStore expects tolist() method
-    mock_embedding = np.array([0.1, 0.2])
+    mock_embedding = _EMB_1D
     mock_transformer.return_value.encode.return_value = mock_embedding
-    mock_qdrant_client.search.return_value = [Mock(payload={"content": "Test response"})]
+    mock_qdrant_client.search.return_value = search_return
     vector_store = VectorStore(mock_config)
 
     # Act
     results = vector_store.search("test query")
 
     # Assert
-    assert len(results) == 1
-    mock_transformer.return_value.encode.assert_called_once_with("test query")
-    mock_qdrant_client.search.assert_called_once()
-
-    # Verify search vector format
-    call_args = mock_qdrant_client.search.call_args[1]
-    assert isinstance(call_args['query_vector'], list)
-    assert call_args['query_vector'] == mock_embedding.tolist()
-
-@patch('src.vectorstore.vector_store.QdrantClient')
-@patch('src.vectorstore.vector_store.SentenceTransformer')
-def test_error_handling(mock_transformer, mock_qdrant, mock_config, mock_qdrant_client):
+    assert len(results) == expected_len
+    mock_transformer.return_value.encode.assert_called_once_with(
+        "test query", normalize_embeddings=True
+    )
+    assert mock_qdrant_client.search.call_count == 1
+
+    # Verify search vector format; np.array_equal compares at C level and
+    # stays cheap when embedding widths grow to real model sizes
+    kwargs = mock_qdrant_client.search.call_args.kwargs
+    assert isinstance(kwargs['query_vector'], list)
+    assert np.array_equal(
+        np.asarray(kwargs['query_vector'], dtype=mock_embedding.dtype),
+        mock_embedding
+    )
+
+def test_cpu_encode_stays_float32(mocker, mock_config, mock_qdrant_client, VectorStore):
+    """Regression: no low-precision cast on CPU.
+
+    sentence-transformers materializes embeddings via Tensor.numpy(), which
+    raises on bfloat16, so the encoder must keep its float32 weights when no
+    GPU is present. The encoder here is a real torch module (not a Mock) so
+    any reintroduced cast crashes the same way it would in production.
+    """
+    import torch
+
+    class NumpyEncoder(torch.nn.Module):
+        """Mirrors the library's embedding extraction path."""
+        def __init__(self):
+            super().__init__()
+            self.linear = torch.nn.Linear(4, 2)
+
+        def encode(self, texts, **kwargs):
+            batch = [texts] if isinstance(texts, str) else texts
+            with torch.no_grad():
+                out = self.linear(
+                    torch.zeros(len(batch), 4, dtype=self.linear.weight.dtype)
+                )
+            embeddings = np.asarray([emb.numpy() for emb in out])
+            return embeddings[0] if isinstance(texts, str) else embeddings
+
+    mocker.patch(
+        'src.vectorstore.vector_store.SentenceTransformer',
+        return_value=NumpyEncoder()
+    )
+    mocker.patch('src.vectorstore.vector_store.torch.cuda.is_available',
+                 return_value=False)
+    mocker.patch('src.vectorstore.vector_store.AsyncQdrantClient')
+    mocker.patch('src.vectorstore.vector_store.QdrantClient',
+                 return_value=mock_qdrant_client)
+    vector_store = VectorStore(mock_config)
+
+    embedding = vector_store._encode_query_uncached("test query")
+
+    assert embedding.dtype == np.float32
+
+def test_error_handling(mocker, mock_config, mock_qdrant_client, VectorStore):
     # Arrange
     mock_qdrant_client.get_collections.side_effect = Exception("Connection error")
-    mock_qdrant.return_value = mock_qdrant_client
+    _patch_dependencies(mocker, mock_qdrant_client)
 
     # Act & Assert
     with pytest.raises(Exception) as exc_info:
         VectorStore(mock_config)
     assert "Connection error" in str(exc_info.value)
-
-@patch('src.vectorstore.vector_store.QdrantClient')
-@patch('src.vectorstore.vector_store.SentenceTransformer')
-def test_search_with_empty_results(mock_transformer, mock_qdrant, mock_config, mock_qdrant_client):
-    # Arrange
-    mock_qdrant.return_value = mock_qdrant_client
-    mock_qdrant_client.search.return_value = []  # Empty search results
-    mock_embedding = np.array([0.1, 0.2])
-    mock_transformer.return_value.encode.return_value = mock_embedding
-    vector_store = VectorStore(mock_config)
-
-    # Act
-    results = vector_store.search("test query")
-
-    # Assert
-    assert isinstance(results, list)
-    assert len(results) == 0
-    mock_qdrant_client.search.assert_called_once()